@@ -1,12 +1,23 @@
-from simple_salesforce import Salesforce, SalesforceAuthenticationFailed, SalesforceGeneralError
-from flask import Flask, request, jsonify
+from simple_salesforce import Salesforce, SalesforceAuthenticationFailed, SalesforceGeneralError, SalesforceMalformedRequest
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from cachetools import TTLCache
+import fastjsonschema
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import requests
 import os
+import io
+import csv
 import time
-import datetime
+import calendar
 import sys
 import threading
 import re
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -35,15 +46,113 @@ required_secrets = {
 missing_secrets = [key for key, value in required_secrets.items() if not value]
 
 if missing_secrets:
-    error_message = f"Error crítico: Faltan las siguientes variables de entorno: {', '.join(missing_secrets)}"
-    logging.critical(error_message)
+    logging.critical("Error crítico: Faltan las siguientes variables de entorno: %s", ', '.join(missing_secrets))
     sys.exit(1) # Detener la aplicación si no se pueden cargar los secretos
 
 logging.info("Todas las credenciales de Salesforce se han cargado correctamente desde las variables de entorno.")
 
 # --- Inicialización de Flask y Conexión Singleton a Salesforce ---
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask basado en orjson (implementado en C).
+
+    Lo usan tanto 'jsonify' como 'request.json'. Mantiene el comportamiento del
+    proveedor por defecto (claves ordenadas, sangría en modo debug) y delega en él
+    los tipos que orjson no conoce, como Decimal. Las fechas se serializan en ISO 8601.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 sf_connection = None
+_sf_lock = threading.Lock()
+
+# Tamaño del pool de conexiones HTTP hacia Salesforce. Debe ser al menos igual al
+# número de hilos que pueden llamar a Salesforce en paralelo dentro de un worker.
+SF_POOL_MAXSIZE = int(os.environ.get("SF_POOL_MAXSIZE", 64))
+
+# Hilos por worker de Gunicorn (ver gunicorn.conf.py).
+GUNICORN_THREADS = int(os.environ.get("GUNICORN_THREADS", 16))
+
+# Executor compartido para lanzar en paralelo llamadas independientes a Salesforce.
+# Las llamadas están limitadas por la latencia de red, no por CPU, por lo que
+# solaparlas reduce el tiempo total a aproximadamente el de la más lenta.
+SF_EXECUTOR_MAX_WORKERS = 16
+SF_EXECUTOR = ThreadPoolExecutor(max_workers=SF_EXECUTOR_MAX_WORKERS, thread_name_prefix="sf")
+
+# Caché en memoria de verificaciones por DOB exitosas, con clave (nombre en minúsculas, dob).
+# TTLCache no es thread-safe, por lo que todo acceso se hace bajo '_verify_lock'.
+_verify_cache = TTLCache(maxsize=10_000, ttl=300)
+_verify_lock = threading.Lock()
+
+# Indica si la organización tiene el campo 'Contact.Phone_Normalized__c'. Se desactiva
+# la primera vez que Salesforce responde INVALID_FIELD, y a partir de entonces el
+# teléfono se compara solo en Python.
+_phone_normalized_field_available = True
+# Si se activa, un contacto no encontrado por 'Phone_Normalized__c' se vuelve a buscar por
+# nombre y DOB comparando el teléfono en Python (útil mientras haya registros antiguos sin
+# el campo poblado). Desactivado por defecto: cuesta una segunda consulta por cada fallo.
+PHONE_NORMALIZED_FALLBACK = os.environ.get("PHONE_NORMALIZED_FALLBACK", "0").lower() in ("1", "true")
+
+def _build_salesforce_session() -> requests.Session:
+    """
+    Crea la sesión HTTP usada por el cliente de Salesforce.
+
+    La sesión mantiene las conexiones abiertas (keep-alive) y las reutiliza desde
+    un pool, evitando un nuevo handshake TCP + TLS en cada llamada. Los errores
+    transitorios del gateway (502, 503, 504) se reintentan con backoff; los
+    métodos no idempotentes (POST, PATCH) no se reintentan.
+
+    Returns:
+        requests.Session: La sesión configurada.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        # Nunca menor que los hilos que pueden usarlo a la vez (los de Gunicorn más los
+        # del executor), para que ninguno espere por una conexión libre.
+        pool_maxsize=max(SF_POOL_MAXSIZE, GUNICORN_THREADS + SF_EXECUTOR_MAX_WORKERS),
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            # Se devuelve la última respuesta para que simple_salesforce la procese.
+            raise_on_status=False,
+        ),
+    )
+    session.mount('https://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+# --- Respuestas de error precalculadas ---
+# Los errores con mensaje fijo se serializan una sola vez al importar el módulo y se
+# devuelven como bytes, evitando construir y codificar el diccionario en cada petición.
+# Los errores con contenido dinámico (listas de campos, valores permitidos) usan 'jsonify'.
+def _prebuilt_error(message: str, status_code: int) -> tuple:
+    """Serializa un error con mensaje fijo. Devuelve (cuerpo, código) para 'Response'."""
+    body = orjson.dumps({"status": "error", "message": message}, option=orjson.OPT_SORT_KEYS) + b"\n"
+    return body, status_code
+
+_ERR_EMPTY_BODY = _prebuilt_error("El cuerpo de la petición no puede estar vacío.", 400)
+_ERR_FULL_NAME_REQUIRED = _prebuilt_error("El campo 'full_name' es requerido.", 400)
+_ERR_LAST_NAME_REQUIRED = _prebuilt_error("El campo 'LastName' es requerido (o un 'full_name' válido).", 400)
+_ERR_NAME_DOB_REQUIRED = _prebuilt_error("Los campos 'full_name' y 'dob' son requeridos.", 400)
+_ERR_NAME_DOB_PHONE_REQUIRED = _prebuilt_error("Los campos 'full_name', 'dob' y 'phone' son requeridos.", 400)
+_ERR_INVALID_DOB = _prebuilt_error("El formato de 'dob' no es válido. Se esperaba YYYY-MM-DD.", 400)
+_ERR_RELATION_REQUIRED = _prebuilt_error("Se requiere 'ContactId' o 'AccountId' para relacionar el caso.", 400)
+_ERR_LOOKUPS_REQUIRED = _prebuilt_error("El campo 'lookups' es requerido y debe ser una lista no vacía.", 400)
+_ERR_CONTACTS_REQUIRED = _prebuilt_error("El cuerpo de la petición debe ser una lista no vacía de contactos.", 400)
+_ERR_UNEXPECTED = _prebuilt_error("Ocurrió un error inesperado.", 500)
 
 # -- Crea la coneccion con salesforce
 def get_salesforce_connection():
@@ -53,7 +162,11 @@ def get_salesforce_connection():
     Esta función implementa el patrón singleton para la conexión a Salesforce,
     asegurando que solo se cree una instancia de conexión durante el ciclo de
     vida de la aplicación. Esto mejora el rendimiento al reutilizar la
-    conexión existente en lugar de crear una nueva para cada solicitud.
+    conexión existente en lugar de crear una nueva para cada solicitud. La
+    conexión usa una sesión HTTP con pool de conexiones persistentes.
+
+    La inicialización está protegida por un lock, por lo que es segura cuando
+    Gunicorn atiende varias peticiones concurrentes con hilos.
 
     La configuración de la conexión (usuario, clave de consumidor, archivo de
     clave privada y dominio) se obtiene de las variables de entorno.
@@ -67,28 +180,44 @@ def get_salesforce_connection():
         Exception: Para cualquier otro error inesperado durante la conexión.
     """
     global sf_connection
+    # Doble verificación: la comprobación externa evita tomar el lock cuando la
+    # conexión ya existe; la interna evita que dos hilos autentiquen a la vez.
     if sf_connection is None:
-        logging.info("Estableciendo nueva conexión con Salesforce...")
-        try:
-            sf_connection = Salesforce(
-                username=SF_USERNAME,
-                consumer_key=SF_CONSUMER_KEY,
-                privatekey=SF_PRIVATE_KEY_CONTENT, # Se usa el contenido de la clave directamente
-                domain=SF_DOMAIN,
-            )
-            logging.info("¡Conexión con Salesforce exitosa!")
-        except SalesforceAuthenticationFailed as e:
-            # Esta excepción tiene .message en lugar de .content
-            logging.error(f"Error de autenticación con Salesforce: {e.code} - {e.message}")
-            raise
-        except SalesforceGeneralError as e:
-            logging.error(f"Error de Salesforce al conectar: {e.code} - {e.content}")
-            raise
-        except Exception as e:
-            logging.error(f"Error inesperado durante la conexión: {e}")
-            raise
+        with _sf_lock:
+            if sf_connection is None:
+                logging.info("Estableciendo nueva conexión con Salesforce...")
+                try:
+                    connection = Salesforce(
+                        username=SF_USERNAME,
+                        consumer_key=SF_CONSUMER_KEY,
+                        privatekey=SF_PRIVATE_KEY_CONTENT, # Se usa el contenido de la clave directamente
+                        domain=SF_DOMAIN,
+                        session=_build_salesforce_session(),
+                    )
+                    # simple_salesforce crea un nuevo SFType en cada acceso a 'sf.Objeto';
+                    # se crean una sola vez los que usan los endpoints.
+                    connection._cached_sobjects = {
+                        name: getattr(connection, name) for name in ('Customer_Service__c', 'Script_Case__c')
+                    }
+                    # Se publica la conexión solo cuando está completa, ya que otros hilos
+                    # la leen sin tomar el lock.
+                    sf_connection = connection
+                    logging.info("¡Conexión con Salesforce exitosa!")
+                except SalesforceAuthenticationFailed as e:
+                    # Esta excepción tiene .message en lugar de .content
+                    logging.error("Error de autenticación con Salesforce: %s - %s", e.code, e.message)
+                    raise
+                except SalesforceGeneralError as e:
+                    logging.error("Error de Salesforce al conectar: %s - %s", e.status, e.content)
+                    raise
+                except Exception as e:
+                    logging.error("Error inesperado durante la conexión: %s", e)
+                    raise
     return sf_connection
 
+# Tabla de traducción para escapar barra invertida y comilla simple en una sola pasada.
+_SOQL_ESCAPE = str.maketrans({'\\': '\\\\', "'": "\\'"})
+
 def _escape_soql_str(value: str) -> str:
     """
     Escapa una cadena de texto para su uso seguro en una consulta SOQL.
@@ -110,7 +239,138 @@ def _escape_soql_str(value: str) -> str:
     """
     if value is None:
         return "NULL"
-    return f"'{str(value).replace('\\', '\\\\').replace("'", "\\'")}'"
+    value = str(value)
+    # Caso habitual: sin caracteres especiales, no hace falta construir otra cadena.
+    if "\\" not in value and "'" not in value:
+        return f"'{value}'"
+    return f"'{value.translate(_SOQL_ESCAPE)}'"
+
+def _sf_data_url(sf, path: str) -> str:
+    """
+    Construye la URL relativa de la REST API para usarla en subpeticiones
+    de la Composite API (p. ej. '/services/data/v59.0/sobjects/Contact').
+
+    Args:
+        sf (simple_salesforce.Salesforce): La conexión activa, de la que se toma la versión de la API.
+        path (str): La ruta del recurso, relativa a '/services/data/vXX.X/'.
+
+    Returns:
+        str: La URL relativa completa.
+    """
+    return f"/services/data/v{sf.sf_version}/{path}"
+
+def _contact_find_query(full_name: str) -> str:
+    """Construye la consulta SOQL que busca un contacto por su nombre completo."""
+    return (
+        f"SELECT Id, FirstName, LastName, Email, AccountId FROM Contact "
+        f"WHERE Name = {_escape_soql_str(full_name)} LIMIT 1"
+    )
+
+def _contact_dob_query(full_name: str, dob: str) -> str:
+    """
+    Construye la consulta SOQL que verifica un contacto por nombre y fecha de nacimiento.
+    El literal de fecha se usa directamente: 'dob' debe estar validado como YYYY-MM-DD.
+    """
+    return (
+        f"SELECT Id, FirstName, LastName, Email, DOB__c FROM Contact "
+        f"WHERE Name = {_escape_soql_str(full_name)} AND DOB__c = {dob} LIMIT 1"
+    )
+
+def _contact_dob_phone_query(full_name: str, dob: str) -> str:
+    """
+    Construye la consulta SOQL que recupera los contactos con nombre y fecha de
+    nacimiento dados, incluyendo el teléfono para verificarlo en Python.
+    """
+    return (
+        f"SELECT Id, FirstName, LastName, Email, DOB__c, Phone FROM Contact "
+        f"WHERE Name = {_escape_soql_str(full_name)} AND DOB__c = {dob}"
+    )
+
+# Tabla de traducción que elimina todo carácter ASCII que no sea dígito, y
+# expresión regular equivalente para el caso (raro) de texto no ASCII.
+_KEEP_DIGITS = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isdigit()))
+_NON_DIGIT_RE = re.compile(r'\D')
+
+def _normalize_phone(phone: str) -> str:
+    """
+    Deja solo los dígitos de un número de teléfono.
+    'str.translate' hace una única pasada en C; la tabla solo cubre ASCII,
+    por lo que las cadenas con otros caracteres usan la expresión regular.
+    """
+    if phone.isascii():
+        return phone.translate(_KEEP_DIGITS)
+    return _NON_DIGIT_RE.sub('', phone)
+
+def _contact_dob_normalized_phone_query(full_name: str, dob: str, phone_digits: str) -> str:
+    """
+    Construye la consulta SOQL que verifica un contacto por nombre, fecha de
+    nacimiento y teléfono normalizado ('Phone_Normalized__c', solo dígitos),
+    de modo que Salesforce devuelve como máximo un registro.
+    """
+    return (
+        f"SELECT Id, FirstName, LastName, Email, DOB__c, Phone FROM Contact "
+        f"WHERE Name = {_escape_soql_str(full_name)} AND DOB__c = {dob} "
+        f"AND Phone_Normalized__c = {_escape_soql_str(phone_digits)} LIMIT 1"
+    )
+
+def _match_contact_by_phone(records: list, phone: str):
+    """
+    Devuelve el primer contacto cuyo teléfono coincide con 'phone', ignorando
+    caracteres de formato (espacios, guiones, paréntesis, etc.), o None.
+    """
+    # Normalizar el número de teléfono de entrada (quitar caracteres no numéricos).
+    input_phone_normalized = _normalize_phone(phone)
+    for contact in records:
+        sf_phone = contact.get('Phone')
+        if sf_phone and _normalize_phone(sf_phone) == input_phone_normalized:
+            return contact
+    return None
+
+# --- Validación de entrada de los endpoints de contacto ---
+# Cada esquema se compila una sola vez al importar el módulo: fastjsonschema genera
+# una función de Python específica para él, sin interpretar el esquema en cada petición.
+# El formato YYYY-MM-DD de 'dob' lo valida '_is_iso_date' después del esquema.
+_NON_EMPTY_STRING = {"type": "string", "minLength": 1}
+
+_validate_find = fastjsonschema.compile({
+    "type": "object",
+    "required": ["full_name"],
+    "properties": {"full_name": _NON_EMPTY_STRING},
+})
+_validate_verify_dob = fastjsonschema.compile({
+    "type": "object",
+    "required": ["full_name", "dob"],
+    "properties": {"full_name": _NON_EMPTY_STRING, "dob": _NON_EMPTY_STRING},
+})
+_validate_verify_phone = fastjsonschema.compile({
+    "type": "object",
+    "required": ["full_name", "dob", "phone"],
+    "properties": {"full_name": _NON_EMPTY_STRING, "dob": _NON_EMPTY_STRING, "phone": _NON_EMPTY_STRING},
+})
+
+def _is_iso_date(value) -> bool:
+    """
+    Comprueba que 'value' sea una fecha YYYY-MM-DD existente (p. ej. rechaza 1990-02-30).
+    Sustituye a 'datetime.strptime', que es mucho más lento y toma un lock global
+    del módulo '_strptime' que serializa los hilos de Gunicorn.
+    """
+    if not (
+        isinstance(value, str) and len(value) == 10 and value.isascii() and value[4] == '-' and value[7] == '-'
+        and value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit()
+    ):
+        return False
+    year, month, day = int(value[:4]), int(value[5:7]), int(value[8:])
+    return year >= 1 and 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]
+
+def _schema_error_response(error: fastjsonschema.JsonSchemaException, required_error: tuple) -> Response:
+    """
+    Traduce un error de validación al mensaje que devuelve el endpoint: un 'dob'
+    presente pero de tipo incorrecto es un error de formato; cualquier otro
+    caso (campo ausente o vacío) es un error de campos requeridos.
+    """
+    if error.name == 'data.dob' and error.rule != 'minLength':
+        return Response(*_ERR_INVALID_DOB, mimetype='application/json')
+    return Response(*required_error, mimetype='application/json')
 
 # --- Funcion encontrar un contacto
 @app.route('/contact/find', methods=['POST'])
@@ -121,45 +381,74 @@ def find_contact():
     """
     sf = get_salesforce_connection()
     data = request.json
-    full_name = data.get('full_name')
 
-    if not full_name:
-        return jsonify({"status": "error", "message": "El campo 'full_name' es requerido."}), 400
+    try:
+        _validate_find(data)
+    except fastjsonschema.JsonSchemaException as e:
+        return _schema_error_response(e, _ERR_FULL_NAME_REQUIRED)
 
     # Se limpia el nombre de espacios extra. La búsqueda se hará sobre el campo
     # compuesto 'Name' de Salesforce, que es más eficiente al estar indexado.
-    full_name = full_name.strip()
+    full_name = data['full_name'].strip()
 
     try:
-        # Se escapa el nombre completo para usarlo de forma segura en la consulta.
-        safe_full_name = _escape_soql_str(full_name) # Revertimos a la consulta SOQL original, que es más rápida para este caso.
-        # Se modifica la consulta para usar el campo 'Name' en lugar de FirstName y LastName.
-        # Esto simplifica la lógica y puede mejorar el rendimiento al usar un único campo indexado.
-        query = (
-            f"SELECT Id, FirstName, LastName, Email, AccountId FROM Contact WHERE Name = {safe_full_name} LIMIT 1"
-        )
+        # Se usa el campo 'Name' en lugar de FirstName y LastName. Esto simplifica
+        # la lógica y puede mejorar el rendimiento al usar un único campo indexado.
+        query = _contact_find_query(full_name)
         result = sf.query(query)
-        logging.info(f"Ejecutando SOQL query: {query}")
+        logging.info("Ejecutando SOQL query: %s", query)
 
         if result.get('totalSize', 0) > 0:
             contact = result['records'][0]
             # Se incluye el AccountId en el log para facilitar la depuración.
-            logging.info(f"Contacto encontrado: {contact['Id']}, AccountId: {contact.get('AccountId')}")
+            logging.info("Contacto encontrado: %s, AccountId: %s", contact['Id'], contact.get('AccountId'))
             response_data = {"status": "found", "contact": contact}
             status_code = 200
             return jsonify(response_data), status_code
         else:
-            logging.info(f"Contacto no encontrado para '{full_name}'.")
+            logging.info("Contacto no encontrado para '%s'.", full_name)
             response_data = {"status": "not_found", "message": f"Contacto con nombre '{full_name}' no encontrado."}
             status_code = 404
             return jsonify(response_data), status_code
 
     except SalesforceGeneralError as e:
-        logging.error(f"Error de Salesforce durante la búsqueda: {e.code} - {e.content}")
+        logging.error("Error de Salesforce durante la búsqueda: %s - %s", e.status, e.content)
         return jsonify({"status": "error", "message": "Error de Salesforce.", "details": e.content}), 500
     except Exception as e:
-        logging.error(f"Error inesperado durante la búsqueda: {e}")
-        return jsonify({"status": "error", "message": "Ocurrió un error inesperado."}), 500
+        logging.error("Error inesperado durante la búsqueda: %s", e)
+        return Response(*_ERR_UNEXPECTED, mimetype='application/json')
+
+def _prepare_contact_data(contact_data: dict) -> bool:
+    """
+    Prepara (en el mismo diccionario) los datos de un contacto para Salesforce.
+
+    Si se recibe 'full_name', se divide en FirstName y LastName, y se asegura
+    que 'Entity_Type__c' esté presente.
+
+    Returns:
+        bool: False si falta el apellido, que es requerido en Salesforce, o si
+        'full_name' no es un texto.
+    """
+    # Si se recibe 'full_name', se divide en FirstName y LastName para Salesforce.
+    if 'full_name' in contact_data:
+        full_name = contact_data.pop('full_name')
+        if not isinstance(full_name, str):
+            return False
+        parts = full_name.strip().split()
+        contact_data.setdefault('FirstName', parts[0] if parts else "")
+        contact_data.setdefault('LastName', " ".join(parts[1:]) if len(parts) > 1 else "")
+
+    # El apellido es un campo requerido en Salesforce para los contactos.
+    if not contact_data.get('LastName'):
+        return False
+
+    # Asegurar que el tipo de entidad está presente para la creación del contacto.
+    contact_data.setdefault('Entity_Type__c', 'Individual')
+    return True
+
+# Campo External Id (único) de Account en el que el Flow guarda el ID del contacto que
+# originó la cuenta. Permite recuperar la cuenta directamente, sin buscarla por nombre.
+ACCOUNT_CONTACT_REF_FIELD = 'Contact_Ref__c'
 
 @app.route('/contact/create', methods=['POST'])
 def create_contact():
@@ -168,13 +457,13 @@ def create_contact():
     
     Flujo de ejecución:
     1. Recibe los datos del contacto en formato JSON.
-    2. Crea el registro del Contacto en Salesforce.
-    3. Una automatización (Flow) en Salesforce se activa y crea una Cuenta
-       asociada, nombrandola con el nombre y apellido del contacto en mayúsculas.
-    4. Esta función espera 5 segundos para dar tiempo a que el Flow se ejecute.
-    5. Busca la Cuenta recién creada por su nombre.
-    6. Si la encuentra, actualiza el Contacto para asociarle el ID de la Cuenta.
-    7. Devuelve los datos del contacto creado, incluyendo el ID de la cuenta si se asoció.
+    2. Envía una única petición a la Composite API de Salesforce que:
+       a. Crea el registro del Contacto. Una automatización (Flow) en Salesforce
+          se activa y crea una Cuenta asociada, guardando el ID del contacto en
+          el campo External Id 'Contact_Ref__c' de la cuenta.
+       b. Obtiene la Cuenta recién creada por ese External Id.
+       c. Actualiza el Contacto para asociarle el ID de la Cuenta.
+    3. Devuelve los datos del contacto creado, incluyendo el ID de la cuenta si se asoció.
 
     Espera un JSON con 'LastName' o 'full_name'.
     Ej: {"full_name": "Carlos TEST API", "Email": "carlos.test@example.com"}
@@ -183,83 +472,281 @@ def create_contact():
     contact_data = request.json
 
     if not contact_data:
-        return jsonify({"status": "error", "message": "El cuerpo de la petición no puede estar vacío."}), 400
+        return Response(*_ERR_EMPTY_BODY, mimetype='application/json')
 
     # 1. PREPARACIÓN DE DATOS
-    # Si se recibe 'full_name', se divide en FirstName y LastName para Salesforce.
-    if 'full_name' in contact_data:
-        full_name = contact_data.pop('full_name')
-        parts = full_name.strip().split()
-        contact_data.setdefault('FirstName', parts[0] if parts else "")
-        contact_data.setdefault('LastName', " ".join(parts[1:]) if len(parts) > 1 else "")
-
-    # El apellido es un campo requerido en Salesforce para los contactos.
-    if not contact_data.get('LastName'):
-        return jsonify({"status": "error", "message": "El campo 'LastName' es requerido (o un 'full_name' válido)."}), 400
-
-    # Asegurar que el tipo de entidad está presente para la creación del contacto.
-    contact_data.setdefault('Entity_Type__c', 'Individual')
+    if not _prepare_contact_data(contact_data):
+        return Response(*_ERR_LAST_NAME_REQUIRED, mimetype='application/json')
+
+    logging.info("Petición para crear contacto con datos: %s", contact_data)
+
+    # 2. PREPARACIÓN DE LA PETICIÓN COMPUESTA
+    # Las tres operaciones viajan en una única petición HTTP. El Flow que crea la cuenta
+    # se ejecuta dentro de la transacción del insert y guarda el ID del contacto en el
+    # External Id de la cuenta, por lo que la cuenta se obtiene directamente por ese ID
+    # (sin colisiones entre clientes con el mismo nombre). Las referencias '@{...}' las
+    # resuelve Salesforce.
+    composite_body = {
+        "allOrNone": False,
+        "compositeRequest": [
+            {
+                "method": "POST",
+                "url": _sf_data_url(sf, "sobjects/Contact"),
+                "referenceId": "newContact",
+                "body": contact_data,
+            },
+            {
+                "method": "GET",
+                "url": _sf_data_url(sf, f"sobjects/Account/{ACCOUNT_CONTACT_REF_FIELD}/@{{newContact.id}}?fields=Id"),
+                "referenceId": "acct",
+            },
+            {
+                "method": "PATCH",
+                "url": _sf_data_url(sf, "sobjects/Contact/@{newContact.id}"),
+                "referenceId": "linkAccount",
+                "body": {"AccountId": "@{acct.Id}"},
+            },
+        ],
+    }
 
-    logging.info(f"Petición para crear contacto con datos: {contact_data}")
     try:
-        # 2. CREACIÓN DEL CONTACTO
-        # Se crea únicamente el contacto. El Flow en Salesforce se encargará de la cuenta.
-        create_result = sf.Contact.create(contact_data)
-
-        if create_result.get('success'):
-            new_contact_id = create_result['id']
-            logging.info(f"Contacto creado con ID: {new_contact_id}. Esperando para asociar cuenta vía Flow.")
+        # 3. CREACIÓN DEL CONTACTO, BÚSQUEDA Y ASOCIACIÓN DE LA CUENTA
+        composite_result = sf.restful('composite', method='POST', json=composite_body)
+        sub_results = {r['referenceId']: r for r in composite_result.get('compositeResponse', [])}
 
-            
-            # 4. BÚSQUEDA DE LA CUENTA
-            # Se intenta encontrar la cuenta que el Flow debería haber creado.
-            # Por convención, el Flow nombra la cuenta usando el nombre completo en mayúsculas.
-            account_name = f"{contact_data.get('FirstName', '')} {contact_data.get('LastName', '')}".strip().upper()
-            safe_account_name = _escape_soql_str(account_name)
-            
-            account_id = None
-            try:
-                # Se construye y ejecuta la consulta SOQL para encontrar la cuenta.
-                query = f"SELECT Id FROM Account WHERE Name = {safe_account_name} LIMIT 1"
-                logging.info(f"Buscando cuenta con SOQL: {query}")
-                account_result = sf.query(query)
-                
-                # 5. ASOCIACIÓN DE LA CUENTA
-                if account_result.get('totalSize', 0) > 0:
-                    account_id = account_result['records'][0]['Id']
-                    logging.info(f"Cuenta encontrada con ID: {account_id}. Asociando con el contacto.")
-                    # Se actualiza el campo 'AccountId' en el contacto para crear la relación.
-                    sf.Contact.update(new_contact_id, {'AccountId': account_id})
-                    logging.info(f"Contacto {new_contact_id} actualizado con AccountId {account_id}.")
-                else:
-                    # Si no se encuentra la cuenta, se registra una advertencia.
-                    # El flujo no se detiene, el contacto queda creado pero sin cuenta asociada.
-                    logging.warning(f"No se encontró una cuenta con el nombre '{account_name}' después de 5 segundos.")
-
-            except Exception as e:
-                # 6. MANEJO DE ERRORES DE ASOCIACIÓN
-                # Si la búsqueda o actualización de la cuenta falla, no se interrumpe la respuesta exitosa
-                # de la creación del contacto. Solo se registra el error para depuración.
-                logging.error(f"Ocurrió un error al intentar asociar la cuenta con el contacto: {e}")
-
-            # 7. RESPUESTA FINAL
-            # Se prepara la respuesta JSON, incluyendo el AccountId si la asociación fue exitosa.
-            new_contact_info = {"Id": new_contact_id, **contact_data}
-            if account_id:
-                new_contact_info['AccountId'] = account_id
-            return jsonify({"status": "created", "contact": new_contact_info}), 201
-        else:
+        contact_result = sub_results.get('newContact', {})
+        if contact_result.get('httpStatusCode') != 201:
             # Este bloque se ejecuta si la creación inicial del contacto falla.
             # Un error común aquí es 'CANNOT_EXECUTE_FLOW_TRIGGER' si el Flow tiene un problema.
-            logging.error(f"Error de Salesforce al crear contacto: {create_result.get('errors')}")
-            return jsonify({"status": "error", "message": "Error de Salesforce al crear el contacto.", "details": create_result.get('errors')}), 500
+            errors = contact_result.get('body')
+            logging.error("Error de Salesforce al crear contacto: %s", errors)
+            return jsonify({"status": "error", "message": "Error de Salesforce al crear el contacto.", "details": errors}), 500
+
+        new_contact_id = contact_result['body']['id']
+        logging.info("Contacto creado con ID: %s.", new_contact_id)
+
+        # 4. RESULTADO DE LA ASOCIACIÓN
+        # Si la búsqueda o actualización de la cuenta falla, no se interrumpe la respuesta exitosa
+        # de la creación del contacto. Solo se registra el error para depuración.
+        account_id = None
+        account_result = sub_results.get('acct', {})
+        link_result = sub_results.get('linkAccount', {})
+        if account_result.get('httpStatusCode') == 200:
+            if link_result.get('httpStatusCode') == 204:
+                account_id = account_result['body']['Id']
+                logging.info("Contacto %s actualizado con AccountId %s.", new_contact_id, account_id)
+            else:
+                logging.error("Ocurrió un error al intentar asociar la cuenta con el contacto: %s", link_result.get('body'))
+        elif account_result.get('httpStatusCode') == 404:
+            # El Flow no creó la cuenta o no guardó el ID del contacto en el External Id.
+            # El contacto queda creado pero sin cuenta asociada.
+            logging.warning("No se encontró una cuenta con %s = '%s'.", ACCOUNT_CONTACT_REF_FIELD, new_contact_id)
+        else:
+            logging.error("Ocurrió un error al buscar la cuenta del contacto: %s", account_result.get('body'))
+
+        # 5. RESPUESTA FINAL
+        # Se prepara la respuesta JSON, incluyendo el AccountId si la asociación fue exitosa.
+        new_contact_info = {"Id": new_contact_id, **contact_data}
+        if account_id:
+            new_contact_info['AccountId'] = account_id
+        return jsonify({"status": "created", "contact": new_contact_info}), 201
 
     except SalesforceGeneralError as e:
-        logging.error(f"Error de Salesforce al crear: {e.code} - {e.content}")
+        logging.error("Error de Salesforce al crear: %s - %s", e.status, e.content)
         return jsonify({"status": "error", "message": "Error de Salesforce.", "details": e.content}), 500
     except Exception as e:
-        logging.error(f"Error inesperado al crear: {e}")
-        return jsonify({"status": "error", "message": "Ocurrió un error inesperado."}), 500
+        logging.error("Error inesperado al crear: %s", e)
+        return Response(*_ERR_UNEXPECTED, mimetype='application/json')
+
+# Límites de Bulk API 2.0 aplicados a cada trabajo de carga: filas y bytes (UTF-8) del CSV.
+BULK_MAX_ROWS_PER_JOB = 10_000
+BULK_MAX_BYTES_PER_JOB = 10_000_000
+# Máximo de trabajos por llamada a '/contact/bulk_create'. Cada trabajo ocupa un hilo de
+# SF_EXECUTOR mientras se sube, así que una sola petición no puede acapararlos todos.
+BULK_CREATE_MAX_JOBS = 4
+_ERR_TOO_MANY_CONTACTS = _prebuilt_error(
+    f"La petición supera el máximo de {BULK_CREATE_MAX_JOBS} trabajos de carga "
+    f"({BULK_CREATE_MAX_JOBS * BULK_MAX_ROWS_PER_JOB} contactos o "
+    f"{BULK_CREATE_MAX_JOBS * BULK_MAX_BYTES_PER_JOB // 1_000_000} MB de CSV) por llamada.",
+    400,
+)
+
+def _records_to_csv_chunks(records: list) -> list:
+    """
+    Convierte una lista de registros en uno o más CSV para Bulk API 2.0.
+
+    Cada CSV incluye la cabecera y respeta BULK_MAX_ROWS_PER_JOB y
+    BULK_MAX_BYTES_PER_JOB. Los campos ausentes en un registro quedan vacíos y
+    los booleanos se escriben como 'true'/'false', igual que en JSON.
+
+    Returns:
+        list: Tuplas (csv, número_de_registros).
+    """
+    fieldnames = sorted({field for record in records for field in record})
+    row_buffer = io.StringIO()
+    writer = csv.DictWriter(row_buffer, fieldnames=fieldnames, lineterminator='\n')
+    writer.writeheader()
+    header = row_buffer.getvalue()
+
+    chunks = []
+    header_size = len(header.encode('utf-8'))
+    rows, size = [], header_size
+    for record in records:
+        row_buffer.seek(0)
+        row_buffer.truncate()
+        writer.writerow({
+            field: ('true' if value else 'false') if isinstance(value, bool) else value
+            for field, value in record.items()
+        })
+        row = row_buffer.getvalue()
+        row_size = len(row.encode('utf-8'))
+        if rows and (len(rows) >= BULK_MAX_ROWS_PER_JOB or size + row_size > BULK_MAX_BYTES_PER_JOB):
+            chunks.append((header + "".join(rows), len(rows)))
+            rows, size = [], header_size
+        rows.append(row)
+        size += row_size
+    if rows:
+        chunks.append((header + "".join(rows), len(rows)))
+    return chunks
+
+def _submit_bulk_insert_job(sf, object_name: str, csv_data: str) -> str:
+    """
+    Crea un trabajo de inserción de Bulk API 2.0, sube el CSV y lo cierra
+    ('UploadComplete') para que Salesforce lo procese de forma asíncrona.
+    No espera a que el trabajo termine.
+
+    Returns:
+        str: El ID del trabajo creado.
+    """
+    job = sf.restful('jobs/ingest', method='POST', json={
+        "object": object_name,
+        "operation": "insert",
+        "contentType": "CSV",
+        "lineEnding": "LF",
+    })
+    job_id = job['id']
+
+    # La subida es CSV, no JSON, por lo que se hace directamente con la sesión del cliente.
+    upload_url = f"{sf.bulk2_url}ingest/{job_id}/batches"
+    upload_result = sf.session.put(
+        upload_url,
+        headers={**sf.headers, 'Content-Type': 'text/csv'},
+        data=csv_data.encode('utf-8'),
+    )
+    if upload_result.status_code != 201:
+        sf.restful(f'jobs/ingest/{job_id}', method='PATCH', json={"state": "Aborted"})
+        raise SalesforceGeneralError(upload_url, upload_result.status_code, object_name, upload_result.text)
+
+    sf.restful(f'jobs/ingest/{job_id}', method='PATCH', json={"state": "UploadComplete"})
+    return job_id
+
+@app.route('/contact/bulk_create', methods=['POST'])
+def bulk_create_contacts():
+    """
+    Crea muchos contactos de forma asíncrona usando Bulk API 2.0.
+
+    Cada contacto se prepara igual que en '/contact/create' ('full_name' se
+    divide en FirstName y LastName). Los registros se reparten en trabajos de
+    hasta 10.000 filas y 10 MB, que se envían en paralelo (como máximo
+    BULK_CREATE_MAX_JOBS por llamada). Los contactos con objetos o listas como
+    valor se rechazan, ya que no tienen representación en CSV. La respuesta devuelve
+    los IDs de los trabajos sin esperar a que Salesforce los procese; su estado
+    se consulta en '/services/data/vXX.X/jobs/ingest/{jobId}'. Si solo fallan
+    algunos trabajos, responde 207 con los trabajos enviados y, en 'failed', el
+    índice inicial y el número de contactos de cada trabajo fallido.
+
+    A diferencia de '/contact/create', no se asocia el AccountId creado por el Flow.
+    Espera un JSON: [{"full_name": "Nombre Apellido", "Email": "..."}, ...]
+    """
+    sf = get_salesforce_connection()
+    contacts = request.json
+
+    if not contacts or not isinstance(contacts, list):
+        return Response(*_ERR_CONTACTS_REQUIRED, mimetype='application/json')
+
+    if len(contacts) > BULK_CREATE_MAX_JOBS * BULK_MAX_ROWS_PER_JOB:
+        return Response(*_ERR_TOO_MANY_CONTACTS, mimetype='application/json')
+
+    # Un objeto o una lista se escribiría en el CSV como su 'repr' de Python; en
+    # '/contact/create' Salesforce los rechaza, así que aquí también se rechazan.
+    invalid = [
+        index for index, contact_data in enumerate(contacts)
+        if not isinstance(contact_data, dict) or not _prepare_contact_data(contact_data)
+        or any(isinstance(value, (dict, list)) for value in contact_data.values())
+    ]
+    if invalid:
+        return jsonify({
+            "status": "error",
+            "message": "Todos los contactos requieren 'LastName' (o un 'full_name' válido) y solo admiten valores simples (sin objetos ni listas).",
+            "invalid_indexes": invalid
+        }), 400
+
+    chunks = _records_to_csv_chunks(contacts)
+    if len(chunks) > BULK_CREATE_MAX_JOBS:
+        return Response(*_ERR_TOO_MANY_CONTACTS, mimetype='application/json')
+    logging.info("Petición para crear %s contactos en %s trabajo(s) de Bulk API 2.0.", len(contacts), len(chunks))
+
+    futures = []
+    start_index = 0
+    for csv_data, record_count in chunks:
+        futures.append((start_index, record_count, SF_EXECUTOR.submit(_submit_bulk_insert_job, sf, 'Contact', csv_data)))
+        start_index += record_count
+
+    # Se espera a todos los trabajos aunque alguno falle: los que ya se enviaron siguen
+    # procesándose en Salesforce y sus IDs deben devolverse para no duplicarlos al reintentar.
+    jobs = []
+    failed = []
+    for start_index, record_count, future in futures:
+        try:
+            jobs.append({"id": future.result(), "records": record_count})
+        except SalesforceGeneralError as e:
+            logging.error("Error de Salesforce al crear contactos en lote: %s - %s", e.status, e.content)
+            failed.append({"start_index": start_index, "records": record_count, "details": e.content})
+        except Exception as e:
+            logging.error("Error inesperado al crear contactos en lote: %s", e)
+            failed.append({"start_index": start_index, "records": record_count, "details": "Ocurrió un error inesperado en el servidor."})
+
+    logging.info("Trabajos de Bulk API 2.0 enviados: %s", [job['id'] for job in jobs])
+    if not failed:
+        return jsonify({"status": "accepted", "jobs": jobs}), 202
+    if not jobs:
+        return jsonify({"status": "error", "message": "Error de Salesforce.", "failed": failed}), 500
+    return jsonify({
+        "status": "partial",
+        "message": "Algunos trabajos no se pudieron enviar. Solo deben reintentarse los contactos de 'failed'.",
+        "jobs": jobs,
+        "failed": failed
+    }), 207
+
+# --- Validaciones de Customer_Service__c ---
+# Se construyen una sola vez al importar el módulo en lugar de en cada petición.
+_CS_REQUIRED = frozenset({
+    'AccountId',
+    'CallType__c',
+    'ParentezcoDelCliente__c',
+    'Fast_Note__c',
+    'UltimoAnioDeAyuda__c',
+    'Communication_channel__c',
+    'TipoCliente__c',
+    'TipoHumor_Cliente__c'
+})
+
+# Valores permitidos por picklist, en el orden en que se muestran en los errores.
+_CS_PICKLIST_VALUES = {
+    'CallType__c': ('Inbone', 'Onbone'),
+    'ParentezcoDelCliente__c': ('Cliente', 'Familiar del Cliente', 'Amigo del Cliente', 'Agencia de Gobierno', 'Un tercero', 'eje realtor...'),
+    'UltimoAnioDeAyuda__c': ('2024', '2023', '2022', '2021', '2020', '2019', '2018', '2017 o antes'),
+    'Communication_channel__c': ('Text message', 'Phone', 'In person'),
+    'TipoCliente__c': ('Cliente Actual', 'Cliente Retorno', 'Cliente Nuevo'),
+    'TipoHumor_Cliente__c': (
+        'Enojado', 'Frustrado', 'Desesperado', 'Calmado', 'Feliz', 'Apático', 'Celoso', 'Nublado', 'Preocupado',
+        'Ansioso', 'Agradecido', 'Indeciso', 'Aliviado', 'Preparado', 'Impaciente', 'Inseguro', 'Interesado',
+        'Resuelto', 'Curioso', 'Avergonzado', 'Resentido', 'Resignado', 'Optimista', 'Motivado'
+    )
+}
+
+# Los mismos valores como frozenset, para comprobar la pertenencia en O(1).
+_CS_PICKLISTS = {field: frozenset(values) for field, values in _CS_PICKLIST_VALUES.items()}
 
 @app.route('/customer_service/create', methods=['POST'])
 def create_customer_service_case():
@@ -272,45 +759,25 @@ def create_customer_service_case():
     data = request.json
 
     if not data:
-        return jsonify({"status": "error", "message": "El cuerpo de la petición no puede estar vacío."}), 400
+        return Response(*_ERR_EMPTY_BODY, mimetype='application/json')
     
     #1. Validacion de Campos requeridos
-    required_fields = [
-        'AccountId', 
-        'CallType__c',
-        'ParentezcoDelCliente__c',
-        'Fast_Note__c',
-        'UltimoAnioDeAyuda__c',
-        'Communication_channel__c',
-        'TipoCliente__c',
-        'TipoHumor_Cliente__c'
-    ]
-
-    missing_fields = [field for field in required_fields if field not in data]
+    # Diferencia de conjuntos; se ordena para que el mensaje sea determinista.
+    missing_fields = _CS_REQUIRED - data.keys() if isinstance(data, dict) else _CS_REQUIRED
     if missing_fields:
-        return jsonify({"status": "error", "message": f"Faltan los siguientes campos requeridos: {', '.join(missing_fields)}"}), 400
+        return jsonify({"status": "error", "message": f"Faltan los siguientes campos requeridos: {', '.join(sorted(missing_fields))}"}), 400
 
     #2. Validacion de valores picklists
-    picklists_validations = {
-        'CallType__c': ['Inbone', 'Onbone'],
-        'ParentezcoDelCliente__c': ['Cliente', 'Familiar del Cliente', 'Amigo del Cliente', 'Agencia de Gobierno', 'Un tercero', 'eje realtor...'],
-        'UltimoAnioDeAyuda__c': ['2024', '2023', '2022', '2021', '2020', '2019', '2018', '2017 o antes'],
-        'Communication_channel__c': ['Text message', 'Phone', 'In person'],
-        'TipoCliente__c': ['Cliente Actual', 'Cliente Retorno', 'Cliente Nuevo'],
-        'TipoHumor_Cliente__c':[
-            'Enojado', 'Frustrado', 'Desesperado', 'Calmado', 'Feliz', 'Apático', 'Celoso', 'Nublado', 'Preocupado',
-            'Ansioso', 'Agradecido', 'Indeciso', 'Aliviado', 'Preparado', 'Impaciente', 'Inseguro', 'Interesado',
-            'Resuelto', 'Curioso', 'Avergonzado', 'Resentido', 'Resignado', 'Optimista', 'Motivado'
-        ]
-    }
-
-    for field, valid_values in picklists_validations.items():
-        if data.get(field) not in valid_values:
+    # Todos los valores permitidos son cadenas; la comprobación de tipo evita además
+    # que un valor no hashable (lista, objeto) falle al buscarlo en el frozenset.
+    for field, valid_values in _CS_PICKLISTS.items():
+        value = data.get(field)
+        if not isinstance(value, str) or value not in valid_values:
             return jsonify({
                 "status": "error", 
                 "message": f"Valor invalido para el campo '{field}' ",
                 "provided_value": data[field],
-                "allowed_values": valid_values    
+                "allowed_values": _CS_PICKLIST_VALUES[field]
             }), 400
 
     # 3. Prepara el payload para Salesforce
@@ -318,180 +785,301 @@ def create_customer_service_case():
     #Mapeamos AccountId a Account__c para la relacion
     salesforce_payload['Account__c'] = salesforce_payload.pop('AccountId')
 
-    logging.info(f"Petición para crear Customer_Service__c con datos: {salesforce_payload}")
+    logging.info("Petición para crear Customer_Service__c con datos: %s", salesforce_payload)
 
     try: 
         # 4. Crear el registro en salesforce
-        customer_service_object = getattr(sf, 'Customer_Service__c')
+        customer_service_object = sf._cached_sobjects['Customer_Service__c']
         create_result = customer_service_object.create(salesforce_payload)
 
         if create_result.get('success'):
             new_id = create_result['id']
-            logging.info(f"Customer_Service__c creado con ID: {new_id}")
+            logging.info("Customer_Service__c creado con ID: %s", new_id)
 
             response_data = {"Id": new_id, **data}
             return jsonify({"status": "created", "customer_service": response_data}), 201
         else:
             errors = create_result.get('errors', [])
-            logging.error(f"Error de Salesforce al crear Customer_Service__c: {errors}")
+            logging.error("Error de Salesforce al crear Customer_Service__c: %s", errors)
             return jsonify({
                 "status": "error",
                 "message": "Error de Salesforce al crear el registro de servicio.",
                 "details": errors
             }), 500
     except SalesforceGeneralError as e:
-        logging.error(f"Error de Salesforce al crear Customer_Service__c: {e.code} - {e.content}")
+        logging.error("Error de Salesforce al crear Customer_Service__c: %s - %s", e.status, e.content)
         return jsonify({
             "status": "error", 
             "message": "Error de Salesforce.", 
             "details": e.content
         }), 500
     except Exception as e:
-        logging.error(f"Error inesperado al crear Customer_Service__c: {e}")
-        return jsonify({
-            "status": "error", 
-            "message": "Ocurrió un error inesperado."
-        }), 500
+        logging.error("Error inesperado al crear Customer_Service__c: %s", e)
+        return Response(*_ERR_UNEXPECTED, mimetype='application/json')
 
 @app.route('/contact/verify/dob', methods=['POST'])
 def verify_contact_by_dob():
     """
     Verifica un contacto por nombre completo y fecha de nacimiento (DOB).
-    Utiliza caché para mejorar el rendimiento en solicitudes repetidas.
+    Utiliza caché para mejorar el rendimiento en solicitudes repetidas: las
+    verificaciones exitosas se guardan en memoria durante 5 minutos.
     El campo de fecha de nacimiento en Salesforce debe tener el API Name 'DOB__c'.
     Espera un JSON: {"full_name": "Nombre Apellido", "dob": "YYYY-MM-DD"}
     """
     # Paso 1: Obtener la conexión a Salesforce y los datos de entrada.
     sf = get_salesforce_connection()
     data = request.json
-    full_name = data.get('full_name')
-    dob = data.get('dob')
 
-    # Paso 2: Validar que los campos requeridos no estén vacíos.
-    if not all([full_name, dob]):
-        return jsonify({"status": "error", "message": "Los campos 'full_name' y 'dob' son requeridos."}), 400
+    # Paso 2: Validar que los campos requeridos no estén vacíos y el formato de la fecha.
+    # El formato YYYY-MM-DD previene errores de 'MALFORMED_QUERY' en SOQL.
+    # No se cachea un error de entrada, ya que es un error del cliente.
+    try:
+        _validate_verify_dob(data)
+    except fastjsonschema.JsonSchemaException as e:
+        return _schema_error_response(e, _ERR_NAME_DOB_REQUIRED)
+    # El esquema valida tipos y presencia; aquí se valida el formato YYYY-MM-DD y que la fecha exista.
+    if not _is_iso_date(data['dob']):
+        return Response(*_ERR_INVALID_DOB, mimetype='application/json')
 
     # Limpiar y normalizar el nombre completo.
-    full_name = full_name.strip()
+    full_name = data['full_name'].strip()
+    dob = data['dob']
 
     try:
-        # Paso 4: Validar el formato de la fecha de nacimiento.
-        # SOQL requiere el formato YYYY-MM-DD para literales de fecha. Esta validación
-        # previene errores de 'MALFORMED_QUERY' si el cliente envía un formato incorrecto.
-        try:
-            datetime.datetime.strptime(dob, '%Y-%m-%d')
-        except ValueError:
-            # No se cachea un error de formato de entrada, ya que es un error del cliente.
-            return jsonify({"status": "error", "message": "El formato de 'dob' no es válido. Se esperaba YYYY-MM-DD."}), 400
-
-        # Paso 5: Preparar los datos para la consulta SOQL, usando el campo 'Name'.
-        safe_full_name = _escape_soql_str(full_name)
-        # El literal de fecha se usa directamente, ya que SOQL no requiere comillas para este tipo de dato.
-        safe_dob = dob  # dob ya está validado como YYYY-MM-DD
-
-        # Paso 6: Construir y ejecutar la consulta SOQL.
+        # Paso 3: Consultar la caché. La comparación de 'Name' en SOQL no distingue
+        # mayúsculas, por lo que la clave usa el nombre en minúsculas.
+        cache_key = (full_name.lower(), dob)
+        with _verify_lock:
+            contact = _verify_cache.get(cache_key)
+        if contact is not None:
+            logging.info("Verificación exitosa (caché) para contacto: %s", contact['Id'])
+            return jsonify({"status": "verified", "contact": contact}), 200
+
+        # Paso 4: Construir y ejecutar la consulta SOQL.
         # Se usa el campo 'Name' que es un campo compuesto y generalmente indexado.
-        query = (
-            f"SELECT Id, FirstName, LastName, Email, DOB__c FROM Contact "
-            f"WHERE Name = {safe_full_name} AND DOB__c = {safe_dob} LIMIT 1"
-        )
-        logging.info(f"Ejecutando SOQL de verificación: {query}")
+        query = _contact_dob_query(full_name, dob)
+        logging.info("Ejecutando SOQL de verificación: %s", query)
         result = sf.query(query)
 
-        # Paso 7: Procesar el resultado, guardarlo en caché y devolver la respuesta.
+        # Paso 5: Procesar el resultado, guardarlo en caché y devolver la respuesta.
+        # Solo se cachean las verificaciones exitosas.
         if result.get('totalSize', 0) > 0:
             # Si se encuentra un registro, la verificación es exitosa.
             contact = result['records'][0]
-            logging.info(f"Verificación exitosa para contacto: {contact['Id']}")
+            with _verify_lock:
+                _verify_cache[cache_key] = contact
+            logging.info("Verificación exitosa para contacto: %s", contact['Id'])
             response_data = {"status": "verified", "contact": contact}
             status_code = 200
         else:
-            logging.info(f"Verificación fallida para '{full_name}' con DOB '{dob}'.")
+            logging.info("Verificación fallida para '%s' con DOB '%s'.", full_name, dob)
             response_data = {"status": "not_verified", "message": "No se encontró un contacto que coincida con los datos proporcionados."}
             status_code = 404
 
         return jsonify(response_data), status_code
 
-    # Paso 8: Manejo de excepciones.
+    # Paso 6: Manejo de excepciones.
     except SalesforceGeneralError as e:
-        logging.error(f"Error de Salesforce durante la verificación: {e.code} - {e.content}")
+        logging.error("Error de Salesforce durante la verificación: %s - %s", e.status, e.content)
         return jsonify({"status": "error", "message": "Error de Salesforce.", "details": e.content}), 500
     except Exception as e:
-        logging.error(f"Error inesperado durante la verificación: {e}")
-        return jsonify({"status": "error", "message": "Ocurrió un error inesperado."}), 500
+        logging.error("Error inesperado durante la verificación: %s", e)
+        return Response(*_ERR_UNEXPECTED, mimetype='application/json')
 
 @app.route('/contact/verify/dob-phone', methods=['POST'])
 def verify_contact_by_phone():
     """
     Verifica un contacto por nombre completo, fecha de nacimiento (DOB) y teléfono.
     Usa el campo 'Name' para una búsqueda más eficiente y compara el teléfono
-    ignorando caracteres de formato (espacios, guiones, etc.).
+    ignorando caracteres de formato (espacios, guiones, etc.). Si la organización
+    tiene el campo 'Phone_Normalized__c', la comparación se hace en la propia consulta.
     Espera un JSON: {"full_name": "Nombre Apellido", "dob": "YYYY-MM-DD", "phone": "1234567890"}
     """
+    global _phone_normalized_field_available
     # Paso 1: Obtener la conexión a Salesforce y los datos de entrada.
     sf = get_salesforce_connection()
     data = request.json
-    full_name = data.get('full_name')
-    dob = data.get('dob')
-    phone = data.get('phone')
 
-    # Paso 2: Validar que los campos requeridos no estén vacíos.
-    if not all([full_name, dob, phone]):
-        return jsonify({"status": "error", "message": "Los campos 'full_name', 'dob' y 'phone' son requeridos."}), 400
+    # Paso 2: Validar que los campos requeridos no estén vacíos y el formato de la fecha.
+    try:
+        _validate_verify_phone(data)
+    except fastjsonschema.JsonSchemaException as e:
+        return _schema_error_response(e, _ERR_NAME_DOB_PHONE_REQUIRED)
+    # El esquema valida tipos y presencia; aquí se valida el formato YYYY-MM-DD y que la fecha exista.
+    if not _is_iso_date(data['dob']):
+        return Response(*_ERR_INVALID_DOB, mimetype='application/json')
 
     # Limpiar y normalizar el nombre completo.
-    full_name = full_name.strip()
+    full_name = data['full_name'].strip()
+    dob = data['dob']
+    phone = data['phone']
 
     try:
-        # Paso 3: Validar el formato de la fecha de nacimiento.
-        try:
-            datetime.datetime.strptime(dob, '%Y-%m-%d')
-        except ValueError:
-            return jsonify({"status": "error", "message": "El formato de 'dob' no es válido. Se esperaba YYYY-MM-DD."}), 400
-
-        # Paso 4: Preparar los datos para la consulta SOQL.
-        safe_full_name = _escape_soql_str(full_name)
-        safe_dob = dob  # dob ya está validado como YYYY-MM-DD
-
-        # Paso 5: Buscar contactos que coincidan con nombre y fecha de nacimiento.
+        # Paso 3: Buscar directamente por el teléfono normalizado, si la organización
+        # tiene el campo. Salesforce devuelve como máximo un registro.
+        phone_digits = _normalize_phone(phone)
+        if _phone_normalized_field_available and phone_digits:
+            query = _contact_dob_normalized_phone_query(full_name, dob, phone_digits)
+            logging.info("Ejecutando SOQL de verificación (Nombre, DOB y teléfono): %s", query)
+            try:
+                result = sf.query(query)
+                if result.get('totalSize', 0) > 0:
+                    contact = result['records'][0]
+                    logging.info("Verificación exitosa para contacto: %s", contact['Id'])
+                    return jsonify({"status": "verified", "contact": contact}), 200
+                if not PHONE_NORMALIZED_FALLBACK:
+                    logging.info("Verificación fallida para '%s'. No se encontró coincidencia por nombre, DOB y teléfono.", full_name)
+                    return jsonify({"status": "not_verified", "message": "No se encontró un contacto que coincida con los datos proporcionados."}), 404
+            except SalesforceMalformedRequest as e:
+                if 'INVALID_FIELD' not in str(e.content):
+                    raise
+                logging.warning("El campo 'Phone_Normalized__c' no existe en Contact; se compara el teléfono en Python.")
+                _phone_normalized_field_available = False
+
+        # Paso 4: Buscar contactos que coincidan con nombre y fecha de nacimiento.
+        # Se usa cuando el campo normalizado no existe o, con PHONE_NORMALIZED_FALLBACK, cuando
+        # no hubo coincidencia (p. ej. registros sin 'Phone_Normalized__c' poblado). Permite
+        # distinguir el motivo del fallo.
         # Se usa el campo 'Name' que está indexado. El teléfono se recupera para ser
         # verificado en Python, permitiendo ignorar diferencias de formato.
-        query = (
-            f"SELECT Id, FirstName, LastName, Email, DOB__c, Phone FROM Contact "
-            f"WHERE Name = {safe_full_name} AND DOB__c = {safe_dob}"
-        )
-        logging.info(f"Ejecutando SOQL de verificación (Nombre y DOB): {query}")
+        query = _contact_dob_phone_query(full_name, dob)
+        logging.info("Ejecutando SOQL de verificación (Nombre y DOB): %s", query)
         result = sf.query(query)
 
-        # Paso 6: Procesar el resultado y verificar el teléfono.
+        # Paso 5: Procesar el resultado y verificar el teléfono.
         if result.get('totalSize', 0) > 0:
-            # Normalizar el número de teléfono de entrada (quitar caracteres no numéricos).
-            input_phone_normalized = re.sub(r'\D', '', phone)
-
-            # Iterar sobre los resultados y comparar los teléfonos normalizados.
-            for contact in result['records']:
-                sf_phone = contact.get('Phone')
-                if sf_phone:
-                    sf_phone_normalized = re.sub(r'\D', '', sf_phone)
-                    if sf_phone_normalized == input_phone_normalized:
-                        logging.info(f"Verificación exitosa para contacto: {contact['Id']}")
-                        return jsonify({"status": "verified", "contact": contact}), 200
-            
+            contact = _match_contact_by_phone(result['records'], phone)
+            if contact:
+                logging.info("Verificación exitosa para contacto: %s", contact['Id'])
+                return jsonify({"status": "verified", "contact": contact}), 200
+
             # Si el bucle termina, se encontraron contactos por nombre/DOB pero el teléfono no coincidió.
-            logging.warning(f"Verificación fallida para '{full_name}'. Se encontraron contactos por nombre/DOB pero el teléfono no coincidió.")
+            logging.warning("Verificación fallida para '%s'. Se encontraron contactos por nombre/DOB pero el teléfono no coincidió.", full_name)
             return jsonify({"status": "not_verified", "message": "Los datos de nombre y fecha de nacimiento son correctos, pero el número de teléfono no coincide."}), 404
         else:
             # No se encontró ningún contacto que coincidiera con nombre y DOB.
-            logging.info(f"Verificación fallida para '{full_name}'. No se encontró coincidencia por nombre y DOB.")
+            logging.info("Verificación fallida para '%s'. No se encontró coincidencia por nombre y DOB.", full_name)
             return jsonify({"status": "not_verified", "message": "No se encontró un contacto que coincida con el nombre y la fecha de nacimiento proporcionados."}), 404
     
-    # Paso 7: Manejo de excepciones.
+    # Paso 6: Manejo de excepciones.
+    except SalesforceGeneralError as e:
+        logging.error("Error de Salesforce durante la verificación: %s - %s", e.status, e.content)
+        return jsonify({"status": "error", "message": "Error de Salesforce.", "details": e.content}), 500
+    except Exception as e:
+        logging.error("Error inesperado durante la verificación: %s", e)
+        return Response(*_ERR_UNEXPECTED, mimetype='application/json')
+
+# Máximo de subpeticiones admitidas por Salesforce en una petición 'composite/batch'.
+BATCH_FIND_CHUNK_SIZE = 25
+# Máximo de búsquedas por llamada a '/contact/batch_find' (8 peticiones 'composite/batch').
+BATCH_FIND_MAX_LOOKUPS = 200
+_ERR_TOO_MANY_LOOKUPS = _prebuilt_error(f"El campo 'lookups' admite como máximo {BATCH_FIND_MAX_LOOKUPS} búsquedas.", 400)
+
+def _build_batch_lookup(lookup):
+    """
+    Valida una búsqueda individual de '/contact/batch_find' y construye su consulta SOQL.
+
+    El tipo de búsqueda depende de los campos presentes, igual que en los endpoints
+    individuales: solo 'full_name' (búsqueda), 'full_name' + 'dob' (verificación por
+    DOB) o 'full_name' + 'dob' + 'phone' (verificación por DOB y teléfono).
+
+    Returns:
+        tuple: (query, error). Exactamente uno de los dos es None.
+    """
+    if not isinstance(lookup, dict) or not isinstance(lookup.get('full_name'), str) or not lookup['full_name']:
+        return None, "El campo 'full_name' es requerido."
+    if lookup.get('phone') and not isinstance(lookup['phone'], str):
+        return None, "El campo 'phone' debe ser un texto."
+    full_name = lookup['full_name'].strip()
+    dob = lookup.get('dob')
+    if not dob:
+        return _contact_find_query(full_name), None
+    if not _is_iso_date(dob):
+        return None, "El formato de 'dob' no es válido. Se esperaba YYYY-MM-DD."
+    if lookup.get('phone'):
+        return _contact_dob_phone_query(full_name, dob), None
+    return _contact_dob_query(full_name, dob), None
+
+def _batch_lookup_result(lookup, batch_result):
+    """
+    Traduce la respuesta de una subpetición de 'composite/batch' al mismo formato
+    que devuelven los endpoints individuales.
+    """
+    if batch_result.get('statusCode') != 200:
+        return {"status": "error", "message": "Error de Salesforce.", "details": batch_result.get('result')}
+    records = batch_result['result'].get('records', [])
+    if not lookup.get('dob'):
+        if records:
+            return {"status": "found", "contact": records[0]}
+        return {"status": "not_found", "message": f"Contacto con nombre '{lookup['full_name'].strip()}' no encontrado."}
+    if lookup.get('phone'):
+        if not records:
+            return {"status": "not_verified", "message": "No se encontró un contacto que coincida con el nombre y la fecha de nacimiento proporcionados."}
+        contact = _match_contact_by_phone(records, lookup['phone'])
+        if contact:
+            return {"status": "verified", "contact": contact}
+        return {"status": "not_verified", "message": "Los datos de nombre y fecha de nacimiento son correctos, pero el número de teléfono no coincide."}
+    if records:
+        return {"status": "verified", "contact": records[0]}
+    return {"status": "not_verified", "message": "No se encontró un contacto que coincida con los datos proporcionados."}
+
+@app.route('/contact/batch_find', methods=['POST'])
+def batch_find_contacts():
+    """
+    Ejecuta varias búsquedas/verificaciones de contactos en una sola llamada.
+
+    Las consultas se agrupan en peticiones 'composite/batch' de hasta 25
+    subpeticiones, de modo que N búsquedas cuestan ceil(N/25) viajes a Salesforce
+    en lugar de N, y los grupos se envían en paralelo. Los resultados se devuelven en el mismo orden que la entrada.
+    Se admiten como máximo BATCH_FIND_MAX_LOOKUPS búsquedas por llamada.
+    Espera un JSON: {"lookups": [{"full_name": "..."}, {"full_name": "...", "dob": "YYYY-MM-DD", "phone": "..."}]}
+    """
+    sf = get_salesforce_connection()
+    data = request.json
+    lookups = data.get('lookups') if isinstance(data, dict) else None
+
+    if not lookups or not isinstance(lookups, list):
+        return Response(*_ERR_LOOKUPS_REQUIRED, mimetype='application/json')
+    if len(lookups) > BATCH_FIND_MAX_LOOKUPS:
+        return Response(*_ERR_TOO_MANY_LOOKUPS, mimetype='application/json')
+
+    # Las búsquedas inválidas se resuelven localmente; solo las válidas viajan a Salesforce.
+    results = [None] * len(lookups)
+    pending = []
+    for index, lookup in enumerate(lookups):
+        query, error = _build_batch_lookup(lookup)
+        if error:
+            results[index] = {"status": "error", "message": error}
+        else:
+            pending.append((index, query))
+
+    try:
+        # Cada grupo de hasta 25 consultas es independiente, así que se envían en paralelo.
+        futures = []
+        for start in range(0, len(pending), BATCH_FIND_CHUNK_SIZE):
+            chunk = pending[start:start + BATCH_FIND_CHUNK_SIZE]
+            batch_body = {
+                "batchRequests": [
+                    {"method": "GET", "url": _sf_data_url(sf, f"query?{urlencode({'q': query})}")}
+                    for _, query in chunk
+                ]
+            }
+            logging.info("Ejecutando composite/batch con %s consultas.", len(chunk))
+            futures.append((chunk, SF_EXECUTOR.submit(sf.restful, 'composite/batch', method='POST', json=batch_body)))
+
+        for chunk, future in futures:
+            batch_result = future.result()
+            for (index, _), sub_result in zip(chunk, batch_result.get('results', [])):
+                results[index] = _batch_lookup_result(lookups[index], sub_result)
+
+        return jsonify({"status": "completed", "results": results}), 200
+
     except SalesforceGeneralError as e:
-        logging.error(f"Error de Salesforce durante la verificación: {e.code} - {e.content}")
+        logging.error("Error de Salesforce durante la búsqueda por lotes: %s - %s", e.status, e.content)
         return jsonify({"status": "error", "message": "Error de Salesforce.", "details": e.content}), 500
     except Exception as e:
-        logging.error(f"Error inesperado durante la verificación: {e}")
-        return jsonify({"status": "error", "message": "Ocurrió un error inesperado."}), 500
+        logging.error("Error inesperado durante la búsqueda por lotes: %s", e)
+        return Response(*_ERR_UNEXPECTED, mimetype='application/json')
 
 @app.route('/script_case', methods=['POST'])
 def create_script_case():
@@ -504,14 +1092,14 @@ def create_script_case():
     case_data = request.json
 
     if not case_data:
-        return jsonify({"status": "error", "message": "El cuerpo de la petición no puede estar vacío."}), 400
+        return Response(*_ERR_EMPTY_BODY, mimetype='application/json')
 
     # Extraer IDs de relación y eliminarlos del diccionario principal para evitar errores.
     contact_id = case_data.pop('ContactId', None)
     account_id = case_data.pop('AccountId', None)
 
     if not contact_id and not account_id:
-        return jsonify({"status": "error", "message": "Se requiere 'ContactId' o 'AccountId' para relacionar el caso."}), 400
+        return Response(*_ERR_RELATION_REQUIRED, mimetype='application/json')
 
     # Preparar el payload para Salesforce. Los campos de relación usan el sufijo '__c'.
     salesforce_payload = case_data.copy()
@@ -520,15 +1108,15 @@ def create_script_case():
     if account_id:
         salesforce_payload['Account__c'] = account_id
 
-    logging.info(f"Petición para crear Script_Case__c con datos: {salesforce_payload}")
+    logging.info("Petición para crear Script_Case__c con datos: %s", salesforce_payload)
     try:
-        # Usamos getattr para acceder al objeto dinámicamente por su nombre de API.
-        script_case_object = getattr(sf, 'Script_Case__c')
+        # Se usa el SFType creado al conectar, en lugar de construirlo en cada petición.
+        script_case_object = sf._cached_sobjects['Script_Case__c']
         create_result = script_case_object.create(salesforce_payload)
 
         if create_result.get('success'):
             new_id = create_result['id']
-            logging.info(f"Script_Case__c creado con ID: {new_id}")
+            logging.info("Script_Case__c creado con ID: %s", new_id)
             # Devolver el ID del nuevo registro junto con los datos enviados.
             new_case_info = {"Id": new_id, **case_data}
             if contact_id: new_case_info['ContactId'] = contact_id
@@ -537,21 +1125,39 @@ def create_script_case():
             return jsonify({"status": "created", "case": new_case_info}), 201
         else:
             errors = create_result.get('errors', [])
-            logging.error(f"Error de Salesforce al crear Script_Case__c: {errors}")
+            logging.error("Error de Salesforce al crear Script_Case__c: %s", errors)
             return jsonify({"status": "error", "message": "Error de Salesforce al crear el caso.", "details": errors}), 500
 
     except SalesforceGeneralError as e:
-        logging.error(f"Error de Salesforce al crear Script_Case__c: {e.code} - {e.content}")
+        logging.error("Error de Salesforce al crear Script_Case__c: %s - %s", e.status, e.content)
         return jsonify({"status": "error", "message": "Error de Salesforce.", "details": e.content}), 500
     except Exception as e:
-        logging.error(f"Error inesperado al crear Script_Case__c: {e}")
-        return jsonify({"status": "error", "message": "Ocurrió un error inesperado."}), 500
+        logging.error("Error inesperado al crear Script_Case__c: %s", e)
+        return Response(*_ERR_UNEXPECTED, mimetype='application/json')
+
+@app.route('/admin/cache/flush', methods=['POST'])
+def flush_cache():
+    """
+    Vacía la caché de verificaciones por DOB de este proceso.
+    Útil tras corregir datos de un contacto en Salesforce.
+    """
+    with _verify_lock:
+        flushed = len(_verify_cache)
+        _verify_cache.clear()
+    logging.info("Caché de verificación vaciada: %s entradas eliminadas.", flushed)
+    return jsonify({"status": "flushed", "entries": flushed}), 200
 
 
 if __name__ == "__main__":
     # Este bloque es solo para desarrollo local.
-    # En producción (Cloud Run), se usará un servidor WSGI como Gunicorn.
-    # La conexión a Salesforce se establecerá de forma 'lazy' en la primera petición,
-    # no durante el arranque.
+    # En producción (Cloud Run), se usa Gunicorn con la configuración de gunicorn.conf.py,
+    # que establece la conexión a Salesforce al arrancar cada worker. Aquí, en cambio,
+    # la conexión se establecerá de forma 'lazy' en la primera petición.
     port = int(os.environ.get("PORT", 8080))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    debug = os.environ.get("FLASK_DEBUG", "0").lower() in ("1", "true")
+    if debug:
+        logging.warning(
+            "Servidor de desarrollo de Flask en modo debug: no apto para producción ni para "
+            "pruebas de carga. Usar 'gunicorn app:app' (configuración en gunicorn.conf.py)."
+        )
+    app.run(host="0.0.0.0", port=port, debug=debug)
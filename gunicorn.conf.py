@@ -0,0 +1,40 @@
+# Configuración de Gunicorn para producción (Cloud Run).
+# Gunicorn carga este archivo automáticamente al arrancar desde el directorio de la aplicación.
+# Cada valor puede ajustarse con variables de entorno sin reconstruir la imagen.
+import os
+
+# Escucha en todas las interfaces en el puerto que Cloud Run indica en $PORT (8080 por defecto).
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# Workers 'gthread': cada proceso atiende varias peticiones a la vez con hilos. La API pasa
+# casi todo el tiempo esperando respuestas de Salesforce, por lo que los hilos solapan esas
+# esperas y el rendimiento escala con el número de hilos.
+# Un solo worker por defecto, adecuado para el entorno de 1 vCPU de Cloud Run: cada proceso
+# tiene su propia conexión, pool de hilos y caché de verificaciones, y '/admin/cache/flush'
+# solo vacía la del proceso que lo atiende. Para más capacidad se suben los hilos.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+# Mantiene abiertas las conexiones del balanceador entre peticiones.
+keepalive = 30
+
+# Con 'gthread' este timeout vigila que el worker siga vivo, no la duración de cada petición;
+# los timeouts de las peticiones los sigue gestionando Cloud Run.
+timeout = 60
+
+
+def post_worker_init(worker):
+    """
+    Autentica con Salesforce al arrancar cada worker, antes de que reciba tráfico,
+    para que el handshake TLS + JWT no lo pague la primera petición de un usuario.
+    Se ejecuta después de que el worker carga 'app:app', de modo que cada proceso
+    tiene su propia conexión. Si falla, el worker arranca igualmente y la conexión
+    se reintenta de forma 'lazy' en la primera petición.
+    """
+    from app import get_salesforce_connection
+
+    try:
+        get_salesforce_connection()
+    except Exception:
+        worker.log.exception("No se pudo precalentar la conexión con Salesforce; se reintentará en la primera petición.")